@@ -2,10 +2,9 @@
 # SPDX-License-Identifier: MIT
 
 
+import hashlib
 from typing import BinaryIO, Tuple
 
-from Crypto.Hash import BLAKE2s
-
 KEY_SIZE = 32
 assert KEY_SIZE * 8 == 256
 
@@ -38,6 +37,11 @@ def read_or_fail(f: BinaryIO, n: int) -> bytes:
     return result
 
 
+def readinto_or_fail(f: BinaryIO, buffer: memoryview) -> None:
+    if f.readinto(buffer) != len(buffer):  # type: ignore
+        raise InsufficientData
+
+
 class InsufficientData(Exception):
     pass
 
@@ -53,7 +57,10 @@ def half_n_half(salt: bytes) -> Tuple[bytes, bytes]:
 
 
 def blake2s_256(data: bytes, salt: bytes) -> bytes:
-    h_obj = BLAKE2s.new(digest_bits=256)
     a, b = half_n_half(salt)
-    h_obj.update(a + data + b)
-    return h_obj.digest()
+    # feeding the parts one by one instead of hashing `a + data + b`
+    # avoids copying the data into a concatenated buffer
+    h = hashlib.blake2s(a, digest_size=32)
+    h.update(data)
+    h.update(b)
+    return h.digest()
@@ -2,16 +2,16 @@
 # SPDX-License-Identifier: MIT
 
 
-import io
+import os
 from io import BytesIO
 from pathlib import Path
 from typing import BinaryIO, Optional
 
-from Crypto.Random import get_random_bytes
-
 from ._common import KEY_SALT_SIZE
 from .a_base import CodenameKey
 from .a_utils.dirty_file import WritingToTempFile
+from .a_utils.randoms import unique_filename
+from .a_utils.shred import shred
 from .b_cryptoblobs import decrypt_from_dios
 from .b_storage_file import StorageFileReader, StorageFileWriter, \
     BlocksIndexedReader
@@ -31,7 +31,7 @@ class DmkFile:
                 with self.path.open('rb') as f:
                     self._salt = StorageFileReader(f).salt
             except FileNotFoundError:
-                self._salt = get_random_bytes(KEY_SALT_SIZE)
+                self._salt = os.urandom(KEY_SALT_SIZE)
         assert self._salt is not None
         return self._salt
 
@@ -82,18 +82,52 @@ class DmkFile:
             # both files are closed now
             wtf.commit()
 
-    def get_bytes(self, codename: str) -> Optional[bytes]:
+    def get_to_io(self, codename: str, target_io: BinaryIO) -> bool:
+        """Decrypts the data cluster by cluster directly into `target_io`,
+        starting from its current position.
+        Returns False (and writes nothing) if there is no data for
+        the `codename`."""
         ck = CodenameKey(codename, self.salt)
         with self._old_blobs() as old_blobs:
             ng = NameGroup(old_blobs, ck)
 
             if not ng.fresh_content_dios:
-                return None
+                return False
+
+            decrypt_from_dios(ng.fresh_content_dios, target_io)
+            return True
+
+    def get_to_file(self, codename: str, target_file: Path) -> bool:
+        """Decrypts the data into a new file with a unique random name
+        in the same directory, and then renames it to `target_file`.
+        If decryption fails, the incomplete file is shredded.
+        Returns False (and creates no files) if there is no data for
+        the `codename`."""
+        ck = CodenameKey(codename, self.salt)
+        with self._old_blobs() as old_blobs:
+            ng = NameGroup(old_blobs, ck)
+
+            if not ng.fresh_content_dios:
+                return False
 
-            with BytesIO() as decrypted:
-                decrypt_from_dios(ng.fresh_content_dios, decrypted)
-                decrypted.seek(0, io.SEEK_SET)
-                return decrypted.read()
+            temp_file = unique_filename(target_file.parent)
+            try:
+                # 'x' fails instead of overwriting a file that appeared
+                # after the name was chosen
+                with temp_file.open('xb') as target_io:
+                    decrypt_from_dios(ng.fresh_content_dios, target_io)
+                os.replace(temp_file, target_file)
+            except BaseException:
+                if temp_file.exists():
+                    shred(temp_file)
+                raise
+            return True
+
+    def get_bytes(self, codename: str) -> Optional[bytes]:
+        with BytesIO() as decrypted:
+            if not self.get_to_io(codename, decrypted):
+                return None
+            return decrypted.getvalue()
 
     def set_bytes(self, codename: str, data: bytes):
         # todo test
@@ -2,7 +2,7 @@
 # SPDX-License-Identifier: MIT
 
 
-from Crypto.Random import get_random_bytes
+import os
 
 from dmk._common import CODENAME_LENGTH_BYTES
 
@@ -18,14 +18,16 @@ class CodenameAscii:
         if length > CODENAME_LENGTH_BYTES:
             raise ValueError(f"Too long: {length}>{CODENAME_LENGTH_BYTES}")
         elif length < CODENAME_LENGTH_BYTES:
-            padding = get_random_bytes(CODENAME_LENGTH_BYTES - length - 1)
+            padding = os.urandom(CODENAME_LENGTH_BYTES - length - 1)
             result = padding + b'\0' + result
         assert len(result) == CODENAME_LENGTH_BYTES
         return result
 
     @classmethod
     def unpadded(cls, codename_data: bytes) -> bytes:
-        return codename_data.rpartition(b'\0')[2]
+        # the name follows the last zero byte. If there is no zero,
+        # rfind returns -1 and we take the whole array
+        return codename_data[codename_data.rfind(b'\0') + 1:]
 
     @classmethod
     def to_ascii(cls, codename: str) -> bytes:
@@ -1,12 +1,6 @@
 def bytes_to_str(lst: bytes):
     # can be used for debugging
-    result = '['
-    if len(lst) > 0:
-        result += hex(lst[0])[2:]
-    if len(lst) > 1:
-        result += ' ' + hex(lst[1])[2:]
+    result = '[' + ' '.join(format(b, 'x') for b in lst[:2])
     if len(lst) > 2:
-        result += ' .. ' + hex(lst[-1])[2:]
-    result += ']'
-    result += f' len {len(lst)}'
-    return result
+        result += f' .. {lst[-1]:x}'
+    return result + f'] len {len(lst)}'
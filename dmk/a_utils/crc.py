@@ -0,0 +1,42 @@
+# SPDX-FileCopyrightText: (c) 2021 Artёm IG <github.com/rtmigo>
+# SPDX-License-Identifier: MIT
+
+
+"""CRC-32 that gives the same results as `zlib.crc32`, but computed by the
+fastest backend available. The backend is chosen once at import time, so
+each call is just a call of a C function."""
+
+import zlib
+from typing import Callable, List, Tuple, Union
+
+Crc32Func = Callable[[Union[bytes, bytearray, memoryview]], int]
+
+
+def _load_libdeflate() -> Crc32Func:
+    # libdeflate checks the CPU features itself and folds the data with
+    # VPCLMULQDQ (AVX-512 or AVX2), PCLMULQDQ or ARMv8 CRC instructions
+    from deflate import crc32
+    return crc32
+
+
+def _load_zlib() -> Crc32Func:
+    return zlib.crc32
+
+
+# from the fastest to the slowest
+_BACKENDS: List[Tuple[str, Callable[[], Crc32Func]]] = [
+    ('libdeflate', _load_libdeflate),
+    ('zlib', _load_zlib),
+]
+
+
+def _select_backend() -> Tuple[str, Crc32Func]:
+    for name, load in _BACKENDS:
+        try:
+            return name, load()
+        except ImportError:
+            pass
+    raise RuntimeError("No CRC-32 backend")  # zlib is always there
+
+
+CRC32_BACKEND, crc32 = _select_backend()
@@ -3,43 +3,39 @@
 
 
 import datetime
-import itertools
 import os
 import random
-import struct
 from base64 import b32encode, urlsafe_b64encode, urlsafe_b64decode
 from pathlib import Path
-
-from Crypto.Random import get_random_bytes
+from typing import Union
 
 from dmk._common import CODENAME_LENGTH_BYTES
 
 
 # todo remove unused funcs
 
-def get_noncrypt_random_bytes(
-        n: int,
-        _struct8k=struct.Struct("!1000Q").pack_into) -> bytes:
-    # For n = 1M it's six times faster
-    # than urandom (aka Crypto.Random.get_random_bytes)
-    # Original:
-    #   https://stackoverflow.com/a/43788050
-    #   by Richard Thiessen, CC BY-SA 3.0
-
-    if n < 8000:
-        longs = (n + 7) // 8
-        return struct.pack("!%iQ" % longs, *map(
-            random.getrandbits, itertools.repeat(64, longs)))[:n]
+_RANDOM_CHUNK_SIZE = 64 * 1024
+
+
+def get_noncrypt_random_bytes(n: int) -> Union[bytes, bytearray]:
+    # Mersenne Twister generates all the n*8 bits with a single C call.
+    # For n = 4K it's four times faster than packing 64-bit numbers
+    # with struct (and the struct was six times faster than urandom).
+    # We use it for the padding of every cluster
+    if n == 0:
+        # getrandbits(0) is an error in Python 3.7 and 3.8
+        return b''
+    if n <= _RANDOM_CHUNK_SIZE:
+        return random.getrandbits(n * 8).to_bytes(n, 'big')
+
+    # The single call would build an n-byte int and then n bytes from it.
+    # For large n (shredding the whole vault) we fill a preallocated array
+    # chunk by chunk, so the peak memory stays about n
     data = bytearray(n)
-    offset = -1
-    for offset in range(0, n - 7999, 8000):
-        _struct8k(data,  # type: ignore
-                  offset,
-                  *map(random.getrandbits, itertools.repeat(64, 1000)))
-    assert offset >= 0
-    offset += 8000
-    data[offset:] = get_noncrypt_random_bytes(n - offset)
-    assert len(data) == n
+    for offset in range(0, n, _RANDOM_CHUNK_SIZE):
+        size = min(_RANDOM_CHUNK_SIZE, n - offset)
+        data[offset:offset + size] = \
+            random.getrandbits(size * 8).to_bytes(size, 'big')
     return data
 
 
@@ -102,7 +98,7 @@ def unique_filename_old(parent: Path) -> Path:
         # length is not secure, but bytes are.
         # How to make the length secure?
         length = random.randint(1, 12)
-        basename = bytes_to_fn_str(get_random_bytes(length))
+        basename = bytes_to_fn_str(os.urandom(length))
         file = parent / basename
         if not file.exists():
             return file
@@ -2,26 +2,25 @@
 # SPDX-License-Identifier: MIT
 
 
+import hashlib
 import io
-import zlib
+import os
+import struct
+from functools import lru_cache
 from pathlib import Path
 from typing import Optional, NamedTuple, BinaryIO
 
-from Crypto.Cipher import ChaCha20
-from Crypto.Hash import BLAKE2s
-from Crypto.Random import get_random_bytes
+from cryptography.hazmat.primitives.ciphers import Cipher, algorithms
 
-from dmk._common import read_or_fail, InsufficientData, \
+from dmk._common import read_or_fail, readinto_or_fail, \
     MAX_CLUSTER_CONTENT_SIZE, CLUSTER_SIZE, CLUSTER_META_SIZE, \
     HEADER_SIZE, IMPRINT_SIZE
 from dmk.a_base._10_kdf import CodenameKey
 from dmk.a_utils.bytes import bytes_to_str
+from dmk.a_utils.crc import crc32
 from dmk.a_utils.dirty_file import WritingToTempFile
 from dmk.a_utils.randoms import set_random_last_modified, \
     get_noncrypt_random_bytes
-from dmk.b_cryptoblobs._10_byte_funcs import bytes_to_uint32, \
-    uint32_to_bytes, uint16_to_bytes, \
-    bytes_to_uint16, uint48_to_bytes, bytes_to_uint48
 
 _DEBUG_PRINT = False
 
@@ -42,16 +41,16 @@ class ItemImprintMismatch(Exception):
 # 96-bit nonce
 ENCRYPTION_NONCE_LEN = 12  # 96-bit
 
+# `cryptography` takes a 128-bit nonce for ChaCha20: the 32-bit little-endian
+# block counter followed by the 96-bit nonce (as in RFC 7539). Starting
+# the counter from zero gives the same keystream as the 96-bit nonce mode
+# of pycryptodome, which we used before
+_INITIAL_COUNTER = bytes(4)
 
-# HEADER_CHECKSUM_LEN = 21
+_ChaCha20 = algorithms.ChaCha20
 
 
-def blake2s(data: bytes, target_size_bytes: int) -> bytes:
-    h_obj = BLAKE2s.new(digest_bits=target_size_bytes * 8)
-    h_obj.update(data)
-    result = h_obj.digest()
-    assert len(result) == target_size_bytes
-    return result
+# HEADER_CHECKSUM_LEN = 21
 
 
 class Cryptographer:
@@ -60,15 +59,31 @@ class Cryptographer:
                  nonce: Optional[bytes]):
         self.fpk = fpk
         if nonce is None:
-            nonce = get_random_bytes(ENCRYPTION_NONCE_LEN)
+            nonce = os.urandom(ENCRYPTION_NONCE_LEN)
 
         if len(nonce) != ENCRYPTION_NONCE_LEN:
             raise ValueError("Unexpected nonce length")
-        self.cipher = ChaCha20.new(key=self.fpk.as_bytes, nonce=nonce)
+        self._nonce = nonce
+        # ChaCha20 is a stream cipher: encryption and decryption are the same
+        # XOR with the keystream. The context keeps the keystream position
+        # between the calls
+        self._context = Cipher(
+            _ChaCha20(self.fpk.as_bytes, _INITIAL_COUNTER + nonce),
+            mode=None).encryptor()
 
     @property
-    def nonce(self):
-        return self.cipher.nonce
+    def nonce(self) -> bytes:
+        return self._nonce
+
+    def encrypt(self, data: bytes) -> bytes:
+        return self._context.update(data)
+
+    def decrypt(self, data: bytes) -> bytes:
+        return self._context.update(data)
+
+    def encrypt_into(self, buffer: memoryview) -> None:
+        """Replaces the plaintext in the buffer with the ciphertext."""
+        self._context.update_into(buffer, buffer)
 
     def __str__(self):
         return '\n'.join([
@@ -97,35 +112,44 @@ def get_stream_size(stream: BinaryIO) -> int:
     return size
 
 
-def get_highest_bit_16(x: int) -> bool:
-    if not 0 <= x <= 0xFFFF:
-        raise ValueError
-    return (0x8000 & x) != 0
+# PART_SIZE field: the highest bit marks the last part, the lower 15 bits
+# are the size of the part
+_LAST_PART_BIT = 0x8000
+_PART_SIZE_MASK = 0x7FFF
 
 
-def set_highest_bit_16(x: int, value: bool) -> int:
-    if not 0 <= x <= 0xFFFF:
-        raise ValueError
-    if value:
-        x |= 0x8000
-        assert get_highest_bit_16(x)
-    else:
-        x = x & 0x7FFF
-        assert not get_highest_bit_16(x)
-    assert 0 <= x <= 0xFFFF
-    return x
+FAKE_CONTENT_VERSION = 0xFFFFFFFFFFFF
 
+_FORMAT_VERSION = 1
 
-def get_lower15bits(x: int) -> int:
-    return x & 0x7FFF
+# CONTENT_CRC32, FORMAT_VER, PART_IDX, PART_SIZE, ITEM_VER (big-endian).
+# The struct module has no 48-bit integers, so ITEM_VER is packed as
+# the high uint16 followed by the low uint32
+_HEADER_STRUCT = struct.Struct('>IBHHHI')
+assert _HEADER_STRUCT.size == HEADER_SIZE
 
 
-FAKE_CONTENT_VERSION = 0xFFFFFFFFFFFF
+# the nonce and the imprint are the only unencrypted data in the cluster
+_IMPRINT_LEN = ENCRYPTION_NONCE_LEN + IMPRINT_SIZE
+assert _IMPRINT_LEN + HEADER_SIZE == CLUSTER_META_SIZE
+# we cannot fit blocks size larger than that into 15 bits
+assert MAX_CLUSTER_CONTENT_SIZE <= _PART_SIZE_MASK
+
 
+@lru_cache(maxsize=16)
+def _key_hasher(key: bytes) -> hashlib.blake2s:
+    # BLAKE2s state that has already absorbed the key. Checking a vault
+    # computes imprints of all its clusters with the same key, so we
+    # hash the key once and then copy the state for each nonce
+    return hashlib.blake2s(key, digest_size=IMPRINT_SIZE)
 
-def to_imprint(cnk: CodenameKey, nonce: bytes):
+
+def to_imprint(cnk: CodenameKey, nonce: bytes) -> bytes:
     assert len(nonce) == ENCRYPTION_NONCE_LEN
-    return blake2s(cnk.as_bytes + nonce, IMPRINT_SIZE)
+    # same as hashing cnk.as_bytes + nonce
+    h = _key_hasher(cnk.as_bytes).copy()
+    h.update(nonce)
+    return h.digest()
 
 
 class Encrypt:
@@ -147,9 +171,6 @@ class Encrypt:
         if not 1 <= parts_len <= 0xFF + 1:
             raise ValueError(f"parts_len={parts_len}")
 
-        # we cannot fit blocks size larger than that into 15 bits
-        assert MAX_CLUSTER_CONTENT_SIZE <= 0x7FFF
-
         if part_size is not None and not (
                 0 <= part_size <= MAX_CLUSTER_CONTENT_SIZE):
             raise ValueError(f"part_size={part_size}")
@@ -159,14 +180,7 @@ class Encrypt:
 
         # self.original_size = original_size
 
-        if not 0 <= part_idx <= 0xFF:
-            raise ValueError(part_idx)
-
         self.part_idx = part_idx
-
-        if not 0 <= parts_len <= 0xFFFFFF:
-            raise ValueError(part_idx)
-
         self.parts_len = parts_len
 
         if part_size is None and not (part_idx == 0 and parts_len == 1):
@@ -235,16 +249,21 @@ class Encrypt:
         themselves will be encrypted.
 
         """
+        outfile.write(self.io_to_bytearray(source))
 
+    def io_to_bytearray(self, source: Optional[BinaryIO]) -> bytearray:
+        """Same as `io_to_io`, but returns the encrypted cluster instead
+        of writing it to a stream."""
         is_fake = source is None
 
-        nonce = get_random_bytes(ENCRYPTION_NONCE_LEN)
+        nonce = os.urandom(ENCRYPTION_NONCE_LEN)
 
         # ITEM_VER
         if is_fake:
-            content_ver_bytes = uint48_to_bytes(FAKE_CONTENT_VERSION)
+            content_ver = FAKE_CONTENT_VERSION
         else:
-            content_ver_bytes = uint48_to_bytes(self.data_version)
+            content_ver = self.data_version
+        assert 0 <= content_ver <= 0xFFFFFFFFFFFF
 
         # PART_SIZE
         if self.part_size is None:
@@ -255,34 +274,53 @@ class Encrypt:
                 assert source is not None
                 self.part_size = get_stream_size(source)
 
-        assert get_lower15bits(self.part_size) == self.part_size
+        assert self.part_size & _PART_SIZE_MASK == self.part_size
 
         is_last_part = self.part_idx == self.parts_len - 1
 
         part_is_last_and_size = self.part_size
-        part_is_last_and_size = set_highest_bit_16(
-            part_is_last_and_size,
-            is_last_part
-        )
-
-        assert get_lower15bits(part_is_last_and_size) == self.part_size, \
-            (get_lower15bits(part_is_last_and_size), self.part_size)
-        assert get_highest_bit_16(part_is_last_and_size) == is_last_part
+        if is_last_part:
+            part_is_last_and_size |= _LAST_PART_BIT
 
         ##########
 
-        body_bytes: Optional[bytes]
-        body_crc_bytes: bytes
-        if is_fake:
-            body_bytes = None
-            body_crc_bytes = get_random_bytes(4)
+        # The whole cluster is assembled in a single buffer and written with
+        # a single call. Everything after the imprint is encrypted: header,
+        # body and padding. The body is read directly into the buffer, and
+        # then the plaintext part is encrypted in place
+        header_start = _IMPRINT_LEN
+        body_start = CLUSTER_META_SIZE
+        body_end = body_start + self.part_size
+        assert body_end <= self.target_size
+
+        buffer = bytearray(self.target_size)
+        buffer_view = memoryview(buffer)
+
+        body_crc: int
+        if is_fake:  # todo test fakes creation separately
+            body_crc = int.from_bytes(os.urandom(4), 'big')
         else:
             assert source is not None
-            body_bytes = read_or_fail(source, self.part_size)
-            body_crc_bytes = uint32_to_bytes(zlib.crc32(body_bytes))
+            body_view = buffer_view[body_start:body_end]
+            readinto_or_fail(source, body_view)
+            body_crc = crc32(body_view)
+
+        _HEADER_STRUCT.pack_into(
+            buffer, header_start,
+            body_crc,
+            _FORMAT_VERSION,
+            self.part_idx,
+            part_is_last_and_size,
+            content_ver >> 32,
+            content_ver & 0xFFFFFFFF)
 
-        part_idx_bytes = uint16_to_bytes(self.part_idx)
-        part_size_bytes = uint16_to_bytes(part_is_last_and_size)
+        # instead of just appending "cryptographic" random bytes with
+        #   outfile.write(urandom(padding_size))
+        # we generate bytes with standard RNG, and then encrypting them.
+        # If urandom created any anomalies distinct from the cipher,
+        # now they will not be
+        buffer_view[body_end:] = get_noncrypt_random_bytes(
+            self.target_size - body_end)
 
         # codename_data = CodenameAscii.to_padded_ascii(self.cnk.codename)
 
@@ -295,57 +333,12 @@ class Encrypt:
             print(cryptographer)
             print("---")
 
-        outfile.write(nonce)
-
-        imprint = to_imprint(self.cnk, nonce)
-        assert imprint != self.cnk.as_bytes
-        outfile.write(imprint)
+        buffer_view[:ENCRYPTION_NONCE_LEN] = nonce
+        buffer_view[ENCRYPTION_NONCE_LEN:header_start] = \
+            to_imprint(self.cnk, nonce)
 
-        assert len(cryptographer.nonce) == ENCRYPTION_NONCE_LEN, \
-            f"Unexpected nonce length: {len(cryptographer.nonce)}"
-
-        assert outfile.seek(0, io.SEEK_CUR) <= 1024
-
-        def encrypt_and_write(data: bytes):
-            outfile.write(cryptographer.cipher.encrypt(data))
-
-        version = bytes((1,))
-
-        header_data = b''.join((
-            # codename_data,
-            body_crc_bytes,
-            version,
-
-            part_idx_bytes,
-            part_size_bytes,
-            content_ver_bytes,
-        ))
-
-        assert len(header_data) == HEADER_SIZE, len(header_data)
-
-        encrypt_and_write(header_data)
-
-        # checksum = blake2s(header_data, HEADER_CHECKSUM_LEN)
-        # encrypt_and_write(checksum)
-
-        assert outfile.tell() == CLUSTER_META_SIZE, f"pos is {outfile.tell()}"
-
-        if not is_fake:  # todo test fakes creation separately
-            assert body_bytes is not None
-            encrypt_and_write(body_bytes)
-
-        # adding random data to the end of block.
-        # This data is not encrypted, it's from urandom (is it ok?)
-        current_size = outfile.tell()
-        padding_size = self.target_size - current_size
-        assert padding_size >= 0
-
-        # instead of just appending "cryptographic" random bytes with
-        #   outfile.write(urandom(padding_size))
-        # we generate bytes with standard RNG, and then encrypting them.
-        # If urandom created any anomalies distinct from the cipher,
-        # now they will not be
-        encrypt_and_write(get_noncrypt_random_bytes(padding_size))
+        cryptographer.encrypt_into(buffer_view[header_start:])
+        return buffer
 
     def io_to_file(self,
                    source_io: BinaryIO,
@@ -398,26 +391,27 @@ class DecryptedIO:
             raise ValueError(f"Unexpected stream position {pos}")
 
     def __read_and_decrypt(self, n: int) -> bytes:
-        encrypted = self._source.read(n)
-        assert encrypted is not None
-        if len(encrypted) < n:
-            raise InsufficientData
-        return self.cfg.cipher.decrypt(encrypted)
+        return self.cfg.decrypt(read_or_fail(self._source, n))
+
+    def __read_nonce_and_imprint(self) -> None:
+        # both unencrypted fields are read in one call
+        _expect_position(self._source, 0)
+        data = read_or_fail(self._source, _IMPRINT_LEN)
+        self._nonce = data[:ENCRYPTION_NONCE_LEN]
+        self._imprint = data[ENCRYPTION_NONCE_LEN:]
 
     @property
     def nonce(self) -> bytes:
         if self._nonce is None:
-            _expect_position(self._source, 0)
-            self._nonce = read_or_fail(self._source, ENCRYPTION_NONCE_LEN)
+            self.__read_nonce_and_imprint()
+            assert self._nonce is not None
         return self._nonce
 
     @property
     def imprint(self) -> bytes:
-
         if self._imprint is None:
-            _ = self.nonce
-            _expect_position(self._source, ENCRYPTION_NONCE_LEN)
-            self._imprint = read_or_fail(self._source, IMPRINT_SIZE)
+            self.__read_nonce_and_imprint()
+            assert self._imprint is not None
         return self._imprint
 
     @property
@@ -461,42 +455,23 @@ class DecryptedIO:
             print(self.cfg)
             print("---")
 
-        body_crc32_data = self.__read_and_decrypt(4)
-        format_version_data = self.__read_and_decrypt(1)
+        # the header is read and decrypted in one call, then sliced
+        header_data = self.__read_and_decrypt(HEADER_SIZE)
+
+        (content_crc32, format_version, part_idx, last_and_size,
+         content_version_hi, content_version_lo) = \
+            _HEADER_STRUCT.unpack(header_data)
 
         # after reading the format version version we can choose different
         # paths. Do not forget that this may not be a version, but random data.
         # And there are no different ways yet: there is only one block format
         # version.
+        assert format_version == _FORMAT_VERSION
 
-        part_idx_data = self.__read_and_decrypt(2)
-        part_size_data = self.__read_and_decrypt(2)
-        content_version_data = self.__read_and_decrypt(6)
-        # header_checksum = self.__read_and_decrypt(HEADER_CHECKSUM_LEN)
-
-        # todo read whole header data, then re-read from bytesio?
-
-        header_data = b''.join((
-            # codename_data,
-            body_crc32_data,
-            format_version_data,
-
-            part_idx_data,
-            part_size_data,
-            content_version_data,
-        ))
-
-        assert len(header_data) == HEADER_SIZE, len(header_data)
-
-        assert format_version_data[0] == 1
-        part_idx = bytes_to_uint16(part_idx_data)
-
-        last_and_size = bytes_to_uint16(part_size_data)
-        part_size = get_lower15bits(last_and_size)
-        is_last = get_highest_bit_16(last_and_size)
+        part_size = last_and_size & _PART_SIZE_MASK
+        is_last = (last_and_size & _LAST_PART_BIT) != 0
 
-        content_version = bytes_to_uint48(content_version_data)
-        content_crc32 = bytes_to_uint32(body_crc32_data)
+        content_version = (content_version_hi << 32) | content_version_lo
 
         return Header(content_crc32=content_crc32,
                       data_version=content_version,
@@ -540,7 +515,7 @@ class DecryptedIO:
             assert self._source.tell() == CLUSTER_META_SIZE, f"pos is {self._source.tell()}"
 
             self._data = self.__read_and_decrypt(self.header.part_size)
-            if zlib.crc32(self._data) != self.header.content_crc32:
+            if crc32(self._data) != self.header.content_crc32:
                 raise VerificationFailure("Body CRC mismatch.")
 
             return self._data
@@ -3,7 +3,6 @@
 
 
 import io
-import zlib
 from pathlib import Path
 from typing import BinaryIO, List, Set
 
@@ -18,14 +17,10 @@ from dmk.b_cryptoblobs._20_encdec_part import get_stream_size, \
 def split_cluster_sizes(full_size: int) -> List[int]:
     if full_size < 0:
         raise ValueError
-    if full_size == 0:
-        return [0]
-    result: List[int] = []
-    s = full_size
-    while s > 0:
-        result.append(min(s, MAX_CLUSTER_CONTENT_SIZE))
-        s -= MAX_CLUSTER_CONTENT_SIZE
-    assert sum(result) == full_size
+    full_parts, remainder = divmod(full_size, MAX_CLUSTER_CONTENT_SIZE)
+    result = [MAX_CLUSTER_CONTENT_SIZE] * full_parts
+    if remainder or not result:
+        result.append(remainder)
     return result
 
 
@@ -46,35 +41,37 @@ class MultipartEncryptor:
         assert sum(self.part_sizes) == full_size
 
         assert self._source_bytesio.tell() == 0
-        self.source_crc = zlib.crc32(self._source_bytesio.read())
-        self._source_bytesio.seek(0, io.SEEK_SET)
 
         self.encrypted_indices: Set[int] = set()
 
     def encrypt(self, part_idx: int, target_io: BinaryIO):
+        target_io.write(self.encrypt_to_bytearray(part_idx))
+        assert target_io.seek(0, io.SEEK_END) == CLUSTER_SIZE
+
+    def encrypt_to_bytearray(self, part_idx: int) -> bytearray:
+        if not 0 <= part_idx < len(self.part_sizes):
+            raise IndexError(f"part_idx={part_idx}")
         if part_idx in self.encrypted_indices:
             raise ValueError(f"The part {part_idx} is already encrypted.")
 
-        src_pos = sum(self.part_sizes[:part_idx])
+        # all the parts except the last one have the maximum size
+        src_pos = part_idx * MAX_CLUSTER_CONTENT_SIZE
         self._source_bytesio.seek(src_pos, io.SEEK_SET)
 
-        Encrypt(self.fpk,
-                parts_len=len(self.part_sizes),
-                part_idx=part_idx,
-                part_size=self.part_sizes[part_idx],
-                data_version=self.content_version
-                ).io_to_io(self._source_bytesio, target_io)
-        assert target_io.seek(0, io.SEEK_END) == CLUSTER_SIZE
+        result = Encrypt(self.fpk,
+                         parts_len=len(self.part_sizes),
+                         part_idx=part_idx,
+                         part_size=self.part_sizes[part_idx],
+                         data_version=self.content_version
+                         ).io_to_bytearray(self._source_bytesio)
 
         self.encrypted_indices.add(part_idx)
+        return result
 
     def encrypt_all_to_list(self) -> List[bytes]:
         result: List[bytes] = []
         for part_idx in range(len(self.part_sizes)):
-            with io.BytesIO() as outio:
-                self.encrypt(part_idx, outio)
-                outio.seek(0, io.SEEK_SET)
-                result.append(outio.read())
+            result.append(bytes(self.encrypt_to_bytearray(part_idx)))
         assert self.all_encrypted
         return result
 
@@ -92,9 +89,9 @@ def decrypt_from_dios(files: List[DecryptedIO],
     if not files:
         raise ValueError("Zero files passed")
 
-    pos = target_io.seek(0, io.SEEK_CUR)
-    if pos != 0:
-        raise ValueError(f"Unexpected initial stream position: {pos}")
+    # the data is written starting from the current position, so it can
+    # be appended to a stream that already contains something
+    start_pos = target_io.seek(0, io.SEEK_CUR)
 
     files = files.copy()
 
@@ -121,6 +118,6 @@ def decrypt_from_dios(files: List[DecryptedIO],
         # maximum data size is 64k, so no need for chunks
         target_io.write(f.read_data())
 
-    pos = target_io.seek(0, io.SEEK_CUR)
-    if pos != sum(f.header.part_size for f in files):
-        raise ValueError(f"Unexpected final stream position: {pos}.")
+    written = target_io.seek(0, io.SEEK_CUR) - start_pos
+    if written != sum(f.header.part_size for f in files):
+        raise ValueError(f"Unexpected number of bytes written: {written}.")
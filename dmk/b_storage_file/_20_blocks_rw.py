@@ -5,12 +5,11 @@
 from __future__ import annotations
 
 import io
+import os
 import random
-from typing import BinaryIO, Optional, Iterable
+from typing import BinaryIO, Optional, Iterator, Union
 
-from Crypto.Random import get_random_bytes
-
-from dmk._common import read_or_fail, CLUSTER_SIZE
+from dmk._common import read_or_fail, readinto_or_fail, CLUSTER_SIZE
 from dmk.b_storage_file._10_fragment_io import FragmentIO
 
 
@@ -28,7 +27,7 @@ class BlocksSequentialWriter:
     def __exit__(self, exc_type, exc_val, exc_tb):
         pass
 
-    def write_bytes(self, buffer: bytes):
+    def write_bytes(self, buffer: Union[bytes, bytearray]):
         if self._tail_written:
             raise RuntimeError("Cannot run this after tail written")
         if len(buffer) != CLUSTER_SIZE:
@@ -45,7 +44,7 @@ class BlocksSequentialWriter:
         if self._tail_written:
             raise RuntimeError("Cannot run this after tail written")
 
-        tail = get_random_bytes(random.randint(1, CLUSTER_SIZE - 1))
+        tail = os.urandom(random.randint(1, CLUSTER_SIZE - 1))
         assert 1 <= len(tail) < CLUSTER_SIZE
         self.target_io.write(tail)
         self._tail_written = True
@@ -63,9 +62,15 @@ class BlocksIndexedReader:
 
         self._start_pos = self.source_io.tell()
         self._io_size = self.source_io.seek(0, io.SEEK_END)
-        self._len = (self._io_size - self._start_pos) // CLUSTER_SIZE
+        blocks_len = (self._io_size - self._start_pos) // CLUSTER_SIZE
         self.source_io.seek(self._start_pos, io.SEEK_SET)
 
+        # start positions of the blocks in the stream. The range takes
+        # constant memory and checks the indexes for us
+        self._positions = range(self._start_pos,
+                                self._start_pos + blocks_len * CLUSTER_SIZE,
+                                CLUSTER_SIZE)
+
     def __enter__(self):
         return self
 
@@ -74,7 +79,7 @@ class BlocksIndexedReader:
             self.source_io.close()
 
     def __len__(self):
-        return self._len
+        return len(self._positions)
 
     @property
     def tail_size(self):
@@ -84,13 +89,20 @@ class BlocksIndexedReader:
 
         if idx < 0:
             raise IndexError("Negative value")
-        if idx >= len(self):
-            raise IndexError(f"Must not be larger than {len(self)}")
 
-        return FragmentIO(self.source_io,
-                          self._start_pos + idx * CLUSTER_SIZE,
-                          CLUSTER_SIZE)
+        # raises IndexError if idx >= len(self)
+        return FragmentIO(self.source_io, self._positions[idx], CLUSTER_SIZE)
+
+    def readinto(self, idx: int, buffer: bytearray) -> None:
+        """Reads the whole block into `buffer` without creating a new
+        `bytes` object. The same buffer may be reused for many blocks."""
+        if len(buffer) != CLUSTER_SIZE:
+            raise ValueError("Unexpected length")
+        if idx < 0:
+            raise IndexError("Negative value")
+        self.source_io.seek(self._positions[idx], io.SEEK_SET)
+        readinto_or_fail(self.source_io, memoryview(buffer))
 
-    def __iter__(self) -> Iterable[FragmentIO]:
-        for i in range(len(self)):
-            yield self.io(i)
+    def __iter__(self) -> Iterator[FragmentIO]:
+        for pos in self._positions:
+            yield FragmentIO(self.source_io, pos, CLUSTER_SIZE)
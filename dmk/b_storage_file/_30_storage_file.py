@@ -28,12 +28,11 @@ def version_to_bytes(ver: int) -> bytes:
     if not 0 <= ver < 4:
         raise ValueError
 
-    a = random.randint(0, 0xFF)
-    while True:
-        b = random.randint(0, 0xFF)
-        data = bytes((a, b))
-        if bytes_to_version(data) == ver:
-            return data
+    a = random.getrandbits(8)
+    # six random high bits, the two low bits adjust the sum. This gives
+    # the same distribution as retrying random `b` until the sum matches
+    b = (random.getrandbits(6) << 2) | ((ver - a) % 4)
+    return bytes((a, b))
 
 
 def bytes_to_version(data: bytes) -> int:
@@ -50,14 +49,12 @@ class StorageFileWriter:
         if output_io.seek(0, io.SEEK_CUR) != 0:
             raise ValueError("Unexpected stream position")
 
-        # the first ever file format has version number 1
-        output_io.write(version_to_bytes(1))
-
-        # WRITING SALT (32 BYTES)
-
         if len(salt) != KEY_SALT_SIZE:
             raise ValueError("Unexpected salt size")
-        output_io.write(salt)
+
+        # the first ever file format has version number 1. The version
+        # and the salt are written with a single call
+        output_io.write(version_to_bytes(1) + salt)
 
         assert output_io.tell() == BLOCKS_START_POS, output_io.tell()
 
@@ -79,13 +76,14 @@ class StorageFileReader:
         if input_io.seek(0, io.SEEK_CUR) != 0:
             raise ValueError("Unexpected stream position")
 
-        ver = bytes_to_version(read_or_fail(input_io, 2))
+        # the version and the salt are read at once and then sliced
+        header = read_or_fail(input_io, 2 + KEY_SALT_SIZE)
+
+        ver = bytes_to_version(header[:2])
         if ver != 1:
             raise ValueError(f"Unexpected version: {ver}")
 
-        # READING SALT
-
-        self.salt = read_or_fail(input_io, KEY_SALT_SIZE)
+        self.salt = header[2:]
 
         assert input_io.tell() == BLOCKS_START_POS, input_io.tell()
 
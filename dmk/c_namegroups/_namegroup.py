@@ -2,7 +2,8 @@
 # SPDX-License-Identifier: MIT
 
 
-from typing import List, BinaryIO, Optional
+from collections import defaultdict
+from typing import List, BinaryIO, Optional, Dict
 
 from dmk.a_base import CodenameKey
 from dmk.b_cryptoblobs import DecryptedIO
@@ -42,8 +43,7 @@ class NameGroup:
 
         self.items: List[NameGroupItem] = []
 
-        for idx in range(len(self.blobs)):
-            input_io = self.blobs.io(idx)
+        for idx, input_io in enumerate(self.blobs):
             assert input_io.tell() == 0
             dio = DecryptedIO(self.cnk, input_io)
             if not dio.belongs_to_namegroup:
@@ -55,16 +55,9 @@ class NameGroup:
             # of the 256-bit private keys or the 256-bit imprints.
             # We believe that any of these collisions are impossible.
             #
-            # But if speed is not a priority, we can double-check our belief
-            # in the absence of imprint collisions.
-
-            if dio.contains_data:
-                # checking CRC-32 of the decrypted body is ok
-                assert dio.data is not None
-            else:
-                # already checked 48-bit decrypted constant content_ver is ok,
-                # just recheck the property returns none
-                assert dio.data is None
+            # We do not decrypt the bodies here: the scan only needs the
+            # headers. The CRC-32 of the body is still checked, but lazily,
+            # when the data of the fresh blocks is actually read.
 
             gf = NameGroupItem(idx, dio)
             self.items.append(gf)
@@ -94,14 +87,16 @@ class NameGroup:
         # next versions will update the file instead of rewriting it, and
         # and incomplete saving will be possible again.
 
-        all_content_files = [gf for gf in self.items if gf.dio.contains_data]
-        self.all_content_versions = set(gf.dio.header.data_version
-                                        for gf in all_content_files)
+        # grouping the content blocks by version in a single pass
+        items_by_ver: Dict[int, List[NameGroupItem]] = defaultdict(list)
+        for gf in self.items:
+            if gf.dio.contains_data:
+                items_by_ver[gf.dio.header.data_version].append(gf)
+        self.all_content_versions = set(items_by_ver)
 
         # trying versions from maximum to minimum
         for ver in sorted(self.all_content_versions, reverse=True):
-            files_by_ver = [gf for gf in all_content_files
-                            if gf.dio.header.data_version == ver]
+            files_by_ver = items_by_ver[ver]
             last_part_idx: Optional[int] = next(
                 (gf.dio.header.part_idx
                  for gf in files_by_ver
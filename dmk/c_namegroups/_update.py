@@ -6,10 +6,11 @@ import io
 import random
 from typing import List, BinaryIO, Set, NamedTuple
 
+from dmk._common import CLUSTER_SIZE
 from dmk.a_base import CodenameKey
 from dmk.b_cryptoblobs import MultipartEncryptor
 from dmk.b_storage_file import BlocksIndexedReader, BlocksSequentialWriter
-from dmk.c_namegroups._fakes import create_fake_bytes
+from dmk.c_namegroups._fakes import create_fake_bytearray
 from dmk.c_namegroups._namegroup import NameGroup
 from dmk.c_namegroups.content_ver import increased_data_version
 
@@ -49,14 +50,15 @@ class TaskEncrypt(NamedTuple):
 
 def copy_block(old_blobs: BlocksIndexedReader,
                old_block_idx: int,
-               new_blobs: BlocksSequentialWriter):
-    old_buf = old_blobs.io(old_block_idx).read()
-    # todo don't recompute crc32
-    new_blobs.write_bytes(old_buf)
+               new_blobs: BlocksSequentialWriter,
+               buffer: bytearray):
+    # the caller passes the same buffer for all the blocks it copies
+    old_blobs.readinto(old_block_idx, buffer)
+    new_blobs.write_bytes(buffer)
 
 
 def add_fake(cdk: CodenameKey, new_blobs: BlocksSequentialWriter):
-    new_blobs.write_bytes(create_fake_bytes(cdk))
+    new_blobs.write_bytes(create_fake_bytearray(cdk))
 
 
 def add_fakes(cdk: CodenameKey,
@@ -70,11 +72,12 @@ def add_fakes(cdk: CodenameKey,
     for _ in range(fakes_to_add_num):
         tasks.append(TaskFake())
 
+    copy_buffer = bytearray(CLUSTER_SIZE)
     for task in tasks:
         if isinstance(task, TaskFake):
             add_fake(cdk, new_blobs)
         elif isinstance(task, TaskKeep):
-            copy_block(old_blobs, task.old_block_idx, new_blobs)
+            copy_block(old_blobs, task.old_block_idx, new_blobs, copy_buffer)
         else:
             raise TypeError
     new_blobs.write_tail()  # todo test
@@ -165,18 +168,16 @@ def update_namegroup_b(cdk: CodenameKey,
     # in random order: copying old blocks, writing fake blocks,
     # adding new content
     random.shuffle(tasks)
+    copy_buffer = bytearray(CLUSTER_SIZE)
     for task in tasks:
         if isinstance(task, TaskFake):
             add_fake(cdk, new_blobs)
         elif isinstance(task, TaskEncrypt):
             assert not encryptor.all_encrypted
-            with io.BytesIO() as temp_io:
-                encryptor.encrypt(part_idx=task.part_idx,
-                                  target_io=temp_io)
-                temp_io.seek(0, io.SEEK_SET)
-                new_blobs.write_bytes(temp_io.read())
+            new_blobs.write_bytes(
+                encryptor.encrypt_to_bytearray(part_idx=task.part_idx))
         elif isinstance(task, TaskKeep):
-            copy_block(old_blobs, task.old_block_idx, new_blobs)
+            copy_block(old_blobs, task.old_block_idx, new_blobs, copy_buffer)
         else:
             raise TypeError
     new_blobs.write_tail()
@@ -28,7 +28,11 @@ setup(
 
     packages=find_packages(include='dmk/*'),
     python_requires='>=3.7',
-    install_requires=['pycryptodome', 'click', 'argon2-cffi', 'click_shell'],
+    # ChaCha20 contexts without an explicit backend: cryptography 3.1.
+    # CRC-32 of memoryviews: deflate 0.4.0
+    install_requires=['cryptography>=3.1', 'click', 'argon2-cffi',
+                      'click_shell'],
+    extras_require={'fast': ['deflate>=0.4.0']},
 
     description="Experimental storage with entries encrypted independently.",
 
@@ -56,6 +56,14 @@ class TestBlobsListFile(unittest.TestCase):
                         with self.assertRaises(IndexError):
                             reader.io(3)
 
+                        buffer = bytearray(CLUSTER_SIZE)
+                        reader.readinto(1, buffer)
+                        self.assertEqual(buffer, b)
+                        reader.readinto(0, buffer)
+                        self.assertEqual(buffer, a)
+                        with self.assertRaises(IndexError):
+                            reader.readinto(3, buffer)
+
     # def test_write_read_bytes(self):
     #     with BytesIO() as large_io:
     #         clusters = [
@@ -0,0 +1,35 @@
+# SPDX-FileCopyrightText: (c) 2021 Artёm IG <github.com/rtmigo>
+# SPDX-License-Identifier: MIT
+
+
+import unittest
+import zlib
+
+from dmk._common import MAX_CLUSTER_CONTENT_SIZE
+from dmk.a_utils.crc import crc32, CRC32_BACKEND, _BACKENDS
+from dmk.a_utils.randoms import get_noncrypt_random_bytes
+
+
+class TestCrc32(unittest.TestCase):
+    def test_backend_selected(self):
+        self.assertIn(CRC32_BACKEND, [name for name, _ in _BACKENDS])
+
+    def test_same_as_zlib(self):
+        for size in [0, 1, 15, 16, 17, 255, MAX_CLUSTER_CONTENT_SIZE]:
+            data = get_noncrypt_random_bytes(size)
+            self.assertEqual(crc32(data), zlib.crc32(data))
+            self.assertEqual(crc32(memoryview(data)), zlib.crc32(data))
+
+    def test_all_available_backends_agree(self):
+        data = get_noncrypt_random_bytes(MAX_CLUSTER_CONTENT_SIZE)
+        for name, load in _BACKENDS:
+            try:
+                func = load()
+            except ImportError:
+                continue
+            with self.subTest(name):
+                self.assertEqual(func(data), zlib.crc32(data))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -67,6 +67,18 @@ class TestEncryptDecryptFiles(unittest.TestCase):
     def test_encdec_empty(self):
         self._encrypt_decrypt('name', b'')
 
+    def test_part_idx_out_of_range(self):
+        fpk = CodenameKey('name', testing_salt)
+        for body in [b'', b'hello',
+                     bytes(MAX_CLUSTER_CONTENT_SIZE + 1)]:
+            with self.subTest(f"Size {len(body)}"), BytesIO(body) as src:
+                me = MultipartEncryptor(fpk, src, content_version=5)
+                for bad_idx in [-1, len(me.part_sizes), 3]:
+                    with self.assertRaises(IndexError):
+                        me.encrypt_to_bytearray(bad_idx)
+                self.assertEqual(len(me.encrypted_indices), 0)
+                self.assertFalse(me.all_encrypted)
+
     def test_encdec_random(self):
         for _ in range(10):
             name = random_alpha_string(0, 10)
@@ -2,6 +2,7 @@
 # SPDX-License-Identifier: MIT
 
 
+import hashlib
 import io
 import random
 import unittest
@@ -13,10 +14,47 @@ from dmk.a_base._05_codename import CodenameAscii
 from dmk.a_base._10_kdf import FasterKDF, CodenameKey
 from dmk.a_utils.randoms import get_noncrypt_random_bytes
 from dmk.b_cryptoblobs._20_encdec_part import Encrypt, \
-    DecryptedIO, is_content_io, is_fake_io
+    DecryptedIO, is_content_io, is_fake_io, Cryptographer, to_imprint
 from tests.common import testing_salt
 
 
+class TestCryptographer(unittest.TestCase):
+    faster: FasterKDF
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.faster = FasterKDF()
+        cls.faster.start()
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        cls.faster.end()
+
+    def test_split_calls_same_as_single_call(self):
+        # Encrypt writes the header, the body and the padding with a single
+        # cipher call, but DecryptedIO reads them with separate calls.
+        # This only works because the keystream continues between the calls
+        cnk = CodenameKey('abc', testing_salt)
+        data = get_noncrypt_random_bytes(CLUSTER_SIZE)
+        nonce = get_noncrypt_random_bytes(12)
+
+        whole = Cryptographer(cnk, nonce).encrypt(data)
+
+        buffer = bytearray(data)
+        Cryptographer(cnk, nonce).encrypt_into(memoryview(buffer))
+        self.assertEqual(buffer, whole)
+
+        for split in [0, 1, 12, 15, 16, 63, 64, 65, 1000, len(data)]:
+            cg = Cryptographer(cnk, nonce)
+            parts = cg.encrypt(data[:split]) + cg.encrypt(data[split:])
+            self.assertEqual(parts, whole)
+
+            cg = Cryptographer(cnk, nonce)
+            self.assertEqual(
+                cg.decrypt(whole[:split]) + cg.decrypt(whole[split:]),
+                data)
+
+
 class TestEncryptDecrypt(unittest.TestCase):
     faster: FasterKDF
 
@@ -67,6 +105,14 @@ class TestEncryptDecrypt(unittest.TestCase):
         with self.assertRaises(ValueError):
             CodenameAscii.to_padded_ascii(longer)
 
+    def test_imprint_is_hash_of_key_and_nonce(self):
+        cnk = CodenameKey('abc', testing_salt)
+        for _ in range(3):
+            nonce = get_noncrypt_random_bytes(12)
+            self.assertEqual(to_imprint(cnk, nonce),
+                             hashlib.blake2s(cnk.as_bytes + nonce,
+                                             digest_size=32).digest())
+
     def test_imprint_match(self):
         data = bytes([77, 88, 99])
         NAME = 'abc'
@@ -163,6 +209,25 @@ class TestEncryptDecrypt(unittest.TestCase):
                                   part_size=part_size,
                                   part_idx=part_idx)
 
+    def test_single_part(self):
+        fpk = CodenameKey('abc', testing_salt)
+        for part_size in [None, 5]:
+            with BytesIO(b'hello') as original_io, \
+                    BytesIO() as encrypted_io:
+                Encrypt(fpk, data_version=123, part_size=part_size) \
+                    .io_to_io(original_io, encrypted_io)
+                self.assertEqual(len(encrypted_io.getvalue()), CLUSTER_SIZE)
+
+                encrypted_io.seek(0, io.SEEK_SET)
+                dio = DecryptedIO(fpk, encrypted_io)
+                self.assertEqual(dio.header.part_idx, 0)
+                self.assertTrue(dio.header.is_last_part)
+                self.assertEqual(dio.header.data_version, 123)
+                self.assertEqual(dio.read_data(), b'hello')
+
+        with self.assertRaises(ValueError):
+            Encrypt(fpk, part_size=MAX_CLUSTER_CONTENT_SIZE + 1)
+
     #
     def test_nonce_is_different_each_time(self):
         fpk = CodenameKey('abc', testing_salt)
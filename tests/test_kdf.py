@@ -4,7 +4,7 @@
 
 import unittest
 
-from dmk.a_base._10_kdf import CodenameKey
+from dmk.a_base._10_kdf import CodenameKey, _password_to_key_cached
 from tests.common import testing_salt
 
 
@@ -34,6 +34,12 @@ class TestKdf(unittest.TestCase):
     def test_key_len(self):
         self.assertEqual(len(CodenameKey('pass', testing_salt).as_bytes), 32)
 
+    def test_derived_once_per_name_and_salt(self):
+        first = CodenameKey('cached', testing_salt).as_bytes
+        hits = _password_to_key_cached.cache_info().hits
+        self.assertEqual(CodenameKey('cached', testing_salt).as_bytes, first)
+        self.assertEqual(_password_to_key_cached.cache_info().hits, hits + 1)
+
     def test_keys_are_different(self):
         self.assertNotEqual(CodenameKey('abc', testing_salt).as_bytes,
                             CodenameKey('d', testing_salt).as_bytes)
@@ -30,6 +30,28 @@ class TestOps(unittest.TestCase):
                     "value_b",
                     get_text(dmk_file, "beta"))
 
+    def test_get_file_keeps_other_files(self):
+        with TemporaryDirectory() as tds:
+            tempdir = Path(tds)
+            dmk_file = DmkFile(tempdir / "dmk")
+            set_text(dmk_file, "alpha", "value_a")
+
+            target = tempdir / "out.txt"
+            sibling = tempdir / "out.txt.tmp"
+            sibling.write_text("precious")
+
+            with self.assertRaises(DmkKeyError):
+                get_file(dmk_file, "beta", target)
+            self.assertFalse(target.exists())
+            self.assertEqual(sibling.read_text(), "precious")
+
+            get_file(dmk_file, "alpha", target)
+            self.assertEqual(target.read_text(), "value_a")
+            self.assertEqual(sibling.read_text(), "precious")
+
+            # only the vault, the sibling and the target
+            self.assertEqual(len(list(tempdir.iterdir())), 3)
+
     def test_get_set_from_file(self):
         with TemporaryDirectory() as tds:
             tempdir = Path(tds)
@@ -19,6 +19,13 @@ class TestRandomBytes(unittest.TestCase):
             n = random.randint(0, 20000)
             self.assertEqual(len(get_noncrypt_random_bytes(n)), n)
 
+    def test_len_large(self):
+        for n in [64 * 1024 - 1, 64 * 1024, 64 * 1024 + 1, 200 * 1024 + 7]:
+            data = get_noncrypt_random_bytes(n)
+            self.assertEqual(len(data), n)
+            # the tail chunk is random too
+            self.assertNotEqual(data[-16:], bytes(16))
+
     def test_type(self):
         self.assertIsInstance(get_noncrypt_random_bytes(16), bytes)
 
@@ -24,6 +24,26 @@ class TestTheFile(unittest.TestCase):
     def tearDownClass(cls) -> None:
         cls.faster.end()
 
+    def test_get_to_io(self):
+        with TemporaryDirectory() as tds:
+            the_file = DmkFile(Path(tds) / "file.dat")
+            data = gen_random_content(min_size=1, max_size=1024 * 16)
+            the_file.set_bytes('name', data)
+
+            with BytesIO() as target:
+                self.assertFalse(the_file.get_to_io('other', target))
+                self.assertEqual(target.getvalue(), b'')
+
+            with BytesIO() as target:
+                self.assertTrue(the_file.get_to_io('name', target))
+                self.assertEqual(target.getvalue(), data)
+
+            with self.subTest("Appending to a non-empty stream"):
+                with BytesIO() as target:
+                    target.write(b'ab')
+                    self.assertTrue(the_file.get_to_io('name', target))
+                    self.assertEqual(target.getvalue(), b'ab' + data)
+
     def test_random_write_and_read(self):
 
         for _ in range(7):